@@ -41,9 +41,18 @@ nvd-api-client has three primary modes:
     To automatically maintain your dataset (without needing to know when
     maintenance was last ran) run:
       ./scripts/nvd_api_client --auto
+    The most recent lastModified value is cached in the mirror's .last_modified
+    file so that the dataset does not need to be searched on every run.
 
 All modes accept --debug or --verbose which print information in stderr.
   nb: use these options to monitor update progress
+
+All modes accept --no-pretty which saves compact json instead of indented json.
+
+All modes accept --compress which saves CVEs as zstd compressed .json.zst files
+(requires the zstandard package). Files are only compressed as they are
+updated, replacing their uncompressed copy (and vice versa without --compress),
+so use --compress from --init onwards.
 """
 
 
@@ -54,15 +63,35 @@ __version__ = "1.0-git"
 
 
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import configparser
 from datetime import datetime, timezone
+from functools import lru_cache
 import json
+import os
 from pathlib import Path
+import queue
+import re
 import sys
+import threading
 import time
-from typing import Optional
+from typing import Optional, Union
 import urllib.parse
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 # API Client Headers
@@ -73,27 +102,141 @@ HEADERS = {"Accept-Language": "en-US", "User-Agent": "nvd-api-client"}
 NVD_API_KEY = None
 
 
-# seconds to wait after a request
+# requests allowed in NVD's rolling rate limit window
 # maximally efficient timing isn't critical
 # NVD's public rate limit is 5 requests in a rolling 30 second window
-# public default based on 5 / 30 * 2 = 12, round down to 10 requests a minute
-# sleeping 6.0 seconds aligns with NVD's Best Practices
+# the window is padded by 2 seconds so that clock and latency differences
+# between this client and NVD never put an extra request in NVD's window
+# once a burst is spent, requests are on average over 6.0 seconds apart which
+# aligns with NVD's Best Practices
+RATE_LIMIT_WINDOW = 30.0 + 2.0
 if NVD_API_KEY:
     # 50 requests in a rolling 30 second window
-    RATE_LIMIT = 0.60
+    RATE_LIMIT_REQUESTS = 50
 else:
-    RATE_LIMIT = 6.0
+    RATE_LIMIT_REQUESTS = 5
 
 
 # requests timeout
 TIMEOUT = 30.0
 
 
+# pages requested from NVD at the same time, all requests share RATE_LIMITER
+FETCH_WORKERS = 2
+
+
+# file in the local NVD mirror caching the most recent lastModified value
+LAST_MODIFIED_FILE = ".last_modified"
+
+
+# file in the local NVD mirror caching the Last-Modified header of NVD's last
+# response, sent as If-Modified-Since by the next --auto run
+HTTP_LAST_MODIFIED_FILE = ".http_last_modified"
+
+
+# zstd compression level used by --compress
+ZSTD_LEVEL = 3
+
+
+# files waiting to be written by write_files()
+# bounded to about two pages of CVEs so that saving applies back-pressure
+WRITE_QUEUE: queue.Queue = queue.Queue(maxsize=4000)
+WRITE_ERRORS: list = []
+
+
+# a CVE's own lastModified precedes nested values such as vendorComments
+LAST_MODIFIED_RE = re.compile(rb'"lastModified"\s*:\s*"([^"]+)"')
+
+
+# retry connection errors, requests which reached NVD are not retried here
+RETRIES = Retry(total=5, read=0, backoff_factor=1)
+
+
+# NVD responses and transport errors retried by get_url(), each retry waits for
+# RATE_LIMITER since the request may have reached NVD
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_ERRORS = (
+    urllib3.exceptions.HTTPError,
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+RETRY_ATTEMPTS = 5
+
+
+# reuse a single connection to NVD across page requests
+# urllib3 is used directly to skip requests' per-request overhead
+HTTP = urllib3.PoolManager(
+    num_pools=1,
+    maxsize=4,
+    retries=RETRIES,
+    headers={**HEADERS, **urllib3.util.make_headers(accept_encoding=True)},
+)
+
+
+# --use-requests session, e.g. for requests' proxy environment variables
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount(
+    "https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=RETRIES)
+)
+
+
 def debug(msg: str) -> None:
     """print to stderr"""
     print("DEBUG: " + msg, file=sys.stderr)
 
 
+class RateLimiter:
+    """
+    rolling window rate limiter
+
+    allows up to limit requests in any window of seconds
+
+    NVD counts a request when it arrives, which is some time after it is sent,
+    so a request stays in the window from acquire() until window seconds after
+    release() is called once its response has been received
+
+    time already spent parsing and saving pages counts towards the wait
+
+    safe to use from multiple threads
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        self.limit = limit
+        self.window = window
+        # requests between acquire() and release()
+        self.in_flight = 0
+        # release times of the most recent requests, older ones are discarded
+        self.released: deque = deque(maxlen=limit)
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """sleep until another request is allowed"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                in_window = [t for t in self.released if t + self.window > now]
+                if self.in_flight + len(in_window) < self.limit:
+                    self.in_flight += 1
+                    return
+                # the lock is released while waiting for the oldest request to
+                # leave the window or for an in flight request to be released
+                timeout = in_window[0] + self.window - now if in_window else None
+                self.condition.wait(timeout)
+
+    def release(self) -> None:
+        """mark a request acquired with acquire() as answered"""
+        with self.condition:
+            self.in_flight -= 1
+            self.released.append(time.monotonic())
+            self.condition.notify_all()
+
+
+RATE_LIMITER = RateLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)
+
+
+@lru_cache(maxsize=1)
 def find_conf() -> Path:
     """find configuration file"""
     filename = ".config/nvd-api-client.conf"
@@ -103,6 +246,7 @@ def find_conf() -> Path:
     raise ValueError(f"No configuration file. Create {Path.home()}/{filename}")
 
 
+@lru_cache(maxsize=1)
 def load_config_path() -> Path:
     """read configuration file for path to local NVD mirror"""
     conf_path = find_conf()
@@ -121,6 +265,20 @@ def load_config_path() -> Path:
     return path
 
 
+@lru_cache
+def create_year_dirs(nvd_path: Path) -> None:
+    """create missing year directories, once per process"""
+    nvd_path.mkdir(parents=True, exist_ok=True)
+
+    with os.scandir(nvd_path) as entries:
+        existing = {entry.name for entry in entries if entry.is_dir()}
+
+    current_year = int(time.strftime("%Y", time.gmtime()))
+    for i in range(1999, current_year + 1):
+        if str(i) not in existing:
+            Path(nvd_path / str(i)).mkdir(exist_ok=True)
+
+
 def verify_dirs() -> Path:
     """create directory structure if needed and return local NVD mirror path"""
     if args.path:
@@ -131,91 +289,330 @@ def verify_dirs() -> Path:
     if DEBUG:
         debug(f"local NVD mirror path is {nvd_path}")
 
-    nvd_path.mkdir(parents=True, exist_ok=True)
-
-    current_year = int(time.strftime("%Y", time.gmtime()))
-    for i in range(1999, current_year + 1):
-        Path(nvd_path / str(i)).mkdir(parents=True, exist_ok=True)
+    create_year_dirs(nvd_path)
 
     return nvd_path
 
 
-def get_url(url: str) -> requests.models.Response:
+def get_url(
+    url: str, if_modified_since: Optional[str] = None
+) -> urllib3.response.HTTPResponse:
     """
-    return a url response after sleeping
+    return a url response, waiting for the rate limiter if needed
 
-    NOTE: could be modified for https://github.com/tomasbasham/ratelimit
-    """
-    if VERBOSE:
-        debug(f"requesting {url}")
-    response = requests.get(url, timeout=TIMEOUT, headers=HEADERS)
+    the body is not read, see load_page()
 
-    if response.status_code != 200:
-        msg = f"API response: {response.status_code}"
+    the response status is 304 if if_modified_since is set and NVD reports
+    that nothing has been modified since
+    """
+    headers = {}
+    if if_modified_since:
+        headers["If-Modified-Since"] = if_modified_since
+
+    for attempt in range(RETRY_ATTEMPTS + 1):
+        if attempt:
+            # exponential backoff: 2, 4, 8, ... seconds
+            time.sleep(2**attempt)
+        RATE_LIMITER.acquire()
+        if VERBOSE:
+            debug(f"requesting {url}")
+        try:
+            if USE_REQUESTS:
+                # requests' underlying urllib3 response
+                response = SESSION.get(
+                    url, timeout=TIMEOUT, stream=True, headers=headers
+                ).raw
+                response.decode_content = True
+            else:
+                response = HTTP.request(
+                    "GET",
+                    url,
+                    timeout=TIMEOUT,
+                    preload_content=False,
+                    headers={**HTTP.headers, **headers},
+                )
+        except RETRY_ERRORS as e:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            if DEBUG:
+                debug(f"{e!r}, retrying {url}")
+            continue
+        finally:
+            RATE_LIMITER.release()
+        if response.status not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS:
+            break
+        # read the error body so the connection can be reused
+        response.drain_conn()
+        response.release_conn()
+        if DEBUG:
+            debug(f"API response: {response.status}, retrying {url}")
+
+    if response.status == 304 and if_modified_since:
+        return response
+    if response.status != 200:
+        response.drain_conn()
+        response.release_conn()
+        msg = f"API response: {response.status}"
         raise Exception(msg)
 
-    time.sleep(RATE_LIMIT)
-
     return response
 
 
+def load_page(page: urllib3.response.HTTPResponse) -> dict:
+    """decode a page's json directly from the connection"""
+    if orjson:
+        return orjson.loads(page.read())
+    return json.load(page)
+
+
+def get_page(url: str, if_modified_since: Optional[str] = None) -> Optional[tuple]:
+    """
+    return a page's decoded json and Last-Modified header
+
+    return None if the page has not been modified since if_modified_since
+    """
+    page = get_url(url, if_modified_since)
+    try:
+        if page.status == 304:
+            return None
+        return load_page(page), page.headers.get("Last-Modified")
+    finally:
+        # read any body left by a 304 or a failed decode before reuse
+        page.drain_conn()
+        page.release_conn()
+
+
+def dump_cve(cve: dict) -> bytes:
+    """
+    serialize a CVE to json
+
+    orjson is used for compact output when it is installed, json's compact
+    output is configured to match it so that a mirror's files do not depend
+    on whether orjson is installed (floats only differ in exponent notation,
+    which NVD's CVSS scores never use)
+
+    pretty output always uses json's 4 space indent so existing mirrors keep
+    their formatting (orjson only supports a 2 space indent)
+    """
+    if PRETTY is None:
+        if orjson:
+            return orjson.dumps(cve)
+        return json.dumps(cve, separators=(",", ":"), ensure_ascii=False).encode(
+            "utf-8"
+        )
+    return json.dumps(cve, indent=PRETTY).encode("utf-8")
+
+
+def fsync_dir(dir_path: Union[str, Path]) -> None:
+    """
+    flush a directory's entries (e.g. renamed files) to disk
+
+    best-effort, directories cannot be opened on Windows and some filesystems
+    """
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_files() -> None:
+    """
+    write files queued by save_cve() in a background thread
+
+    files are written to a temporary file and renamed so that an interrupted
+    run never leaves a truncated CVE in the mirror
+
+    a saved CVE replaces its copy with the other suffix (.json or .json.zst)
+    so that switching --compress never leaves two copies of a CVE
+
+    a queued file without data is a directory to sync once its files are
+    written
+    """
+    while True:
+        path, data = WRITE_QUEUE.get()
+        try:
+            if data is None:
+                fsync_dir(path)
+            else:
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+                if path.endswith(".zst"):
+                    other_path = path[: -len(".zst")]
+                else:
+                    other_path = path + ".zst"
+                try:
+                    os.remove(other_path)
+                except FileNotFoundError:
+                    pass
+        except OSError as exc:
+            WRITE_ERRORS.append(exc)
+        finally:
+            WRITE_QUEUE.task_done()
+
+
+def check_writes() -> None:
+    """raise the first error from write_files(), if any"""
+    if WRITE_ERRORS:
+        raise WRITE_ERRORS[0]
+
+
+def wait_for_writes() -> None:
+    """wait until all queued files are written"""
+    WRITE_QUEUE.join()
+    check_writes()
+
+
 def save_cve(page_json: dict, nvd_path: Path) -> None:
-    """save all  json files from a page"""
+    """queue all json files from a page to be saved by write_files()"""
+    if COMPRESS:
+        suffix = ".json.zst"
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    else:
+        suffix = ".json"
+    saved_dirs = set()
+    # paths are plain strings and lookups are hoisted out of the loop since
+    # an initial download saves every CVE
+    nvd_str = str(nvd_path)
+    exists = os.path.exists
+    put = WRITE_QUEUE.put
     for i in page_json["vulnerabilities"]:
         cve = i["cve"]
-        year = cve["id"][4:8]
-        file_path = Path(f'{nvd_path / year / cve["id"]}.json')
+        cve_id = cve["id"]
+        dir_path = f"{nvd_str}/{cve_id[4:8]}"
+        file_path = f"{dir_path}/{cve_id}{suffix}"
+        if exists(file_path):
+            try:
+                unchanged = read_last_modified(file_path) == cve["lastModified"]
+            except (OSError, ValueError, KeyError):
+                # e.g. a truncated file, rewrite it
+                unchanged = False
+            if unchanged:
+                if VERBOSE:
+                    debug(f"skipping unchanged {cve_id}")
+                continue
         if VERBOSE:
-            debug(f'saving {cve["id"]}')
-        with open(file_path, "w", encoding="utf-8") as file:
-            json.dump(cve, file, indent=PRETTY)
+            debug(f"saving {cve_id}")
+        data = dump_cve(cve)
+        if COMPRESS:
+            data = compressor.compress(data)
+        put((file_path, data))
+        saved_dirs.add(dir_path)
+    # sync renames once per directory instead of once per file
+    for dir_path in saved_dirs:
+        WRITE_QUEUE.put((dir_path, None))
+
+
+def save_last_modified(last_modified_string: str, nvd_path: Path) -> None:
+    """cache the most recent lastModified value in the local NVD mirror"""
+    if DEBUG:
+        debug(f"caching lastModified value {last_modified_string}")
+    Path(nvd_path / LAST_MODIFIED_FILE).write_text(
+        last_modified_string + "\n", encoding="utf-8"
+    )
 
 
-def save_pages(date_range: Optional[tuple] = None) -> None:
+def save_pages(date_range: Optional[tuple] = None, conditional: bool = False) -> None:
     """
     get all pages of CVE results and save them
 
+    if conditional, the first page is requested with If-Modified-Since set to
+    the previous run's Last-Modified header and nothing is saved if NVD reports
+    that nothing has been modified
+
     see https://nvd.nist.gov/developers/vulnerabilities for parameters
     """
 
     nvd_path = verify_dirs()
 
     base_url = "https://services.nvd.nist.gov/rest/json/cves/2.0"
-    start_index = 0
+    next_index = 0
     results_per_page = 2000
-    total_results = results_per_page + 1
-    p = {"resultsPerPage": results_per_page, "startIndex": start_index}
+    # only the first page is requested until totalResults is known
+    total_results = 1
+    p = {"resultsPerPage": results_per_page}
     if date_range:
         p["lastModStartDate"] = date_range[0]
         p["lastModEndDate"] = date_range[1]
+    # only startIndex changes between pages
     params = urllib.parse.urlencode(p)
 
-    while start_index < total_results:
-        url = f"{base_url}?{params}"
-
-        page = get_url(url)
-        page_json = page.json()
-        page.close()
+    http_last_modified_path = Path(nvd_path / HTTP_LAST_MODIFIED_FILE)
+    if conditional and http_last_modified_path.is_file():
+        if_modified_since = http_last_modified_path.read_text(encoding="utf-8").strip()
+    else:
+        if_modified_since = None
+    http_last_modified = None
 
-        save_cve(page_json, nvd_path)
+    # write files in the background while the next pages are requested
+    threading.Thread(target=write_files, daemon=True).start()
 
-        total_results = page_json["totalResults"]
+    # compare strings instead of datetimes
+    last_modified_string = "0"
 
-        if DEBUG:
-            if total_results == 0:
-                debug("no new updates from NVD")
-            elif (start_index + results_per_page) >= total_results:
-                debug(
-                    f"saved results {start_index} through {total_results}"
-                    + f" of {total_results}"
-                )
-            else:
-                debug(
-                    f"saved results {start_index} through {start_index + results_per_page}"
-                    + f" of {total_results}"
-                )
+    # request up to FETCH_WORKERS pages at a time and save them in order
+    executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+    fetching: deque = deque()
 
-        start_index += results_per_page
+    try:
+        while fetching or next_index < total_results:
+            while next_index < total_results and len(fetching) < FETCH_WORKERS:
+                url = f"{base_url}?{params}&startIndex={next_index}"
+                condition = if_modified_since if next_index == 0 else None
+                fetching.append((next_index, executor.submit(get_page, url, condition)))
+                next_index += results_per_page
+
+            start_index, future = fetching.popleft()
+            page = future.result()
+            if page is None:
+                if DEBUG:
+                    debug(f"no new updates from NVD since {if_modified_since}")
+                break
+            page_json, page_last_modified = page
+            if start_index == 0:
+                http_last_modified = page_last_modified
+
+            save_cve(page_json, nvd_path)
+            # stop downloading as soon as a file cannot be written
+            check_writes()
+
+            for i in page_json["vulnerabilities"]:
+                if i["cve"]["lastModified"] > last_modified_string:
+                    last_modified_string = i["cve"]["lastModified"]
+
+            total_results = page_json["totalResults"]
+
+            if DEBUG:
+                if total_results == 0:
+                    debug("no new updates from NVD")
+                elif (start_index + results_per_page) >= total_results:
+                    debug(
+                        f"saved results {start_index} through {total_results}"
+                        + f" of {total_results}"
+                    )
+                else:
+                    debug(
+                        f"saved results {start_index} through {start_index + results_per_page}"
+                        + f" of {total_results}"
+                    )
+    finally:
+        # cancel requests not yet sent, but write every CVE already queued
+        # even if a request failed
+        executor.shutdown(cancel_futures=True)
+        WRITE_QUEUE.join()
+    wait_for_writes()
+
+    if last_modified_string != "0":
+        save_last_modified(last_modified_string, nvd_path)
+    if http_last_modified:
+        http_last_modified_path.write_text(http_last_modified + "\n", encoding="utf-8")
 
 
 def nvd_init() -> None:
@@ -237,12 +634,15 @@ def nvd_init() -> None:
         save_pages()
 
 
-def nvd_maintain(since: datetime) -> None:
+def nvd_maintain(since: datetime, conditional: bool = False) -> None:
     """
     maintain NVD dataset
 
     set the since datetime to the time that NVD dataset was last maintained
 
+    conditional is passed to save_pages() and must only be set when since is
+    the most recent lastModified value of the dataset, i.e. by nvd_auto()
+
     it is not recommended to run this function more than once every two hours
 
     large organizations should use a single requester
@@ -272,7 +672,7 @@ def nvd_maintain(since: datetime) -> None:
     if DEBUG:
         debug(f"searching for modified NVD CVEs between {start_date} and {end_date}")
 
-    save_pages((start_date, end_date))
+    save_pages((start_date, end_date), conditional)
 
 
 def check_last_modified(last_modified: datetime) -> None:
@@ -308,6 +708,50 @@ def format_date(date_str: str) -> datetime:
     return date
 
 
+def read_last_modified(path: Union[str, Path]) -> str:
+    """
+    return the lastModified value of a local CVE file
+
+    avoids decoding the whole file, falling back to json if the regex fails
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError as exc:
+        msg = f"error reading {path}"
+        raise OSError(msg) from exc
+    if str(path).endswith(".zst"):
+        if zstandard is None:
+            msg = f"reading {path} requires the zstandard package"
+            raise ValueError(msg)
+        try:
+            data = zstandard.ZstdDecompressor().decompress(data)
+        except zstandard.ZstdError as exc:
+            msg = f"error decompressing {path}"
+            raise ValueError(msg) from exc
+    match = LAST_MODIFIED_RE.search(data)
+    if match:
+        return match.group(1).decode()
+    return json.loads(data)["lastModified"]
+
+
+def max_last_modified_in_dir(year_path: str) -> str:
+    """return the most recent lastModified value in a year directory"""
+    # compare strings instead of datetimes
+    last_modified_string = "0"
+    # scandir's entries know their type without a stat per file
+    with os.scandir(year_path) as entries:
+        for entry in entries:
+            if not entry.name.endswith((".json", ".json.zst")):
+                continue
+            if not entry.is_file():
+                continue
+            file_last_modified = read_last_modified(entry.path)
+            if file_last_modified > last_modified_string:
+                last_modified_string = file_last_modified
+    return last_modified_string
+
+
 def nvd_last_modified_file() -> datetime:
     """
     search local dataset for most recent lastModified value
@@ -317,32 +761,61 @@ def nvd_last_modified_file() -> datetime:
     nvd_path = verify_dirs()
     if DEBUG:
         debug("searching NVD dataset for most recent lastModified value")
-    # compare strings instead of datetimes
-    last_modified_string = "0"
-    for path in nvd_path.rglob("*.json"):
-        if path.is_dir():
-            continue
-        try:
-            # nb: encoding is unset
-            with open(path) as file:
-                data = json.load(file)
-        except OSError as exc:
-            msg = f"error reading {path}"
-            raise OSError(msg) from exc
-        if data["lastModified"] > last_modified_string:
-            last_modified_string = data["lastModified"]
+    # each year directory is scanned in its own process
+    with os.scandir(nvd_path) as entries:
+        year_paths = sorted(
+            entry.path for entry in entries if entry.is_dir() and entry.name.isdigit()
+        )
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(max_last_modified_in_dir, year_paths)
+        # compare strings instead of datetimes
+        last_modified_string = max(results, default="0")
     if DEBUG:
         debug(f"most recent lastModified value is: {last_modified_string}")
     last_modified = format_date(last_modified_string)
     check_last_modified(last_modified)
+    if last_modified_string != "0":
+        save_last_modified(last_modified_string, nvd_path)
+    return last_modified
+
+
+def nvd_last_modified_cache() -> Optional[datetime]:
+    """
+    read the most recent lastModified value cached by the last run
+
+    the cache is ignored if a year directory has changed since it was written,
+    e.g. when the mirror was updated with git
+    """
+    nvd_path = verify_dirs()
+    cache_path = Path(nvd_path / LAST_MODIFIED_FILE)
+    try:
+        cache_mtime = cache_path.stat().st_mtime
+        last_modified_string = cache_path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    for path in nvd_path.iterdir():
+        if not (path.is_dir() and path.name.isdigit()):
+            continue
+        if path.stat().st_mtime > cache_mtime:
+            if DEBUG:
+                debug(f"{path} changed after {cache_path}, ignoring cache")
+            return None
+    try:
+        last_modified = format_date(last_modified_string)
+    except argparse.ArgumentTypeError:
+        return None
+    if DEBUG:
+        debug(f"cached lastModified value is: {last_modified_string}")
     return last_modified
 
 
 def nvd_auto() -> None:
     """run nvd_maintain with most recent lastModified value in dataset"""
-    last_modified = nvd_last_modified_file()
+    last_modified = nvd_last_modified_cache() or nvd_last_modified_file()
     check_last_modified(last_modified)
-    nvd_maintain(last_modified)
+    # the dataset is up to date with NVD's previous response, so only ask NVD
+    # for pages if it has changed since
+    nvd_maintain(last_modified, conditional=True)
 
 
 if __name__ == "__main__":
@@ -363,7 +836,18 @@ if __name__ == "__main__":
     parser.add_argument("--debug", help="add debug info", action="store_true")
     parser.add_argument("--verbose", help="add verbose debug info", action="store_true")
     parser.add_argument(
-        "--pretty", help="pretty json output", default=True, action="store_true"
+        "--pretty",
+        help="pretty json output",
+        default=True,
+        action=argparse.BooleanOptionalAction,
+    )
+    parser.add_argument(
+        "--compress", help="save zstd compressed json", action="store_true"
+    )
+    parser.add_argument(
+        "--use-requests",
+        help="send HTTP requests with requests instead of urllib3",
+        action="store_true",
     )
 
     args = parser.parse_args()
@@ -383,6 +867,12 @@ if __name__ == "__main__":
     else:
         PRETTY = None
 
+    if args.compress and zstandard is None:
+        raise ValueError("--compress requires the zstandard package")
+    COMPRESS = args.compress
+
+    USE_REQUESTS = args.use_requests
+
     if args.init:
         nvd_init()
     elif args.auto:
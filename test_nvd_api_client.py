@@ -0,0 +1,87 @@
+"""
+tests for nvd_api_client's request retries, run with:
+  python -m unittest
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import unittest
+from unittest import mock
+
+import nvd_api_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    """serve queued (status, body) responses, None drops the connection"""
+
+    protocol_version = "HTTP/1.1"
+    responses: list = []
+
+    def do_GET(self) -> None:
+        response = self.responses.pop(0)
+        if response is None:
+            self.close_connection = True
+            return
+        status, body = response
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class TestGetUrl(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/cves"
+        for patch in (
+            mock.patch.multiple(
+                nvd_api_client,
+                create=True,
+                DEBUG=False,
+                VERBOSE=False,
+                USE_REQUESTS=False,
+                RATE_LIMITER=nvd_api_client.RateLimiter(100, 0.0),
+            ),
+            mock.patch("time.sleep"),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self) -> None:
+        nvd_api_client.HTTP.clear()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_page(self) -> dict:
+        page = nvd_api_client.get_url(self.url)
+        try:
+            self.assertEqual(page.status, 200)
+            return nvd_api_client.load_page(page)
+        finally:
+            page.release_conn()
+
+    def test_retry_status_with_body(self) -> None:
+        # the 503's body must be read before its connection is reused
+        Handler.responses = [
+            (503, b'{"message": "Service Unavailable"}'),
+            (200, b'{"totalResults": 0}'),
+        ]
+        self.assertEqual(self.get_page(), {"totalResults": 0})
+
+    def test_retry_dropped_connection(self) -> None:
+        Handler.responses = [None, (200, b'{"totalResults": 0}')]
+        self.assertEqual(self.get_page(), {"totalResults": 0})
+
+    def test_retry_limit(self) -> None:
+        Handler.responses = [(503, b"{}")] * (nvd_api_client.RETRY_ATTEMPTS + 1)
+        with self.assertRaisesRegex(Exception, "API response: 503"):
+            self.get_page()
+
+
+if __name__ == "__main__":
+    unittest.main()